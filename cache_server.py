@@ -0,0 +1,30 @@
+"""
+Serves one VerdictCache (exact LRU plus semantic cache) to every watcher on the host, so that
+guardianAI.py and guardianAI2.py share cache hits and a single embedding model.
+
+    python cache_server.py [--address HOST:PORT]
+    python guardianAI.py --cache-server [HOST:PORT]
+
+GUARDIAN_CACHE_AUTHKEY must be set to the same secret for the server and the watchers; the
+server refuses to start without it.
+"""
+import argparse
+
+from guardianAI import DEFAULT_CACHE_SERVER, CacheManager, VerdictCache, cache_server_authkey, parse_address
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Shared verdict cache for GuardianAI watchers.")
+    parser.add_argument("--address", default=DEFAULT_CACHE_SERVER, metavar="HOST:PORT", help="Address to listen on")
+    args = parser.parse_args(argv)
+    # Refuse to start without a key, before paying for the model load
+    authkey = cache_server_authkey()
+
+    cache = VerdictCache()
+    cache.semantic.warmup()
+    CacheManager.register("get_cache", callable=lambda: cache)
+    server = CacheManager(address=parse_address(args.address), authkey=authkey).get_server()
+    print(f"Cache server listening on {args.address}")
+    server.serve_forever()
+
+if __name__ == "__main__":
+    main()
@@ -1,138 +1,928 @@
 import os
+import argparse
+import atexit
+import re
 import time
 import json
+import multiprocessing
+import orjson
+import queue
+import sched
 import shutil
+import ssl
 import subprocess
+import threading
+import types
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from multiprocessing.managers import BaseManager, RemoteError
+import numpy as np
+from numba import njit
 from watchdog.observers import Observer
-from watchdog.events import FileSystemEventHandler
+from watchdog.events import PatternMatchingEventHandler
+from watchdog.utils.patterns import match_any_paths
 import httpx
+import certifi
 from langchain_groq import ChatGroq
 from langchain_core.prompts import PromptTemplate
 from dotenv import load_dotenv
 
+import win32api
 import win32security
 
 load_dotenv()
 
+NAME_CACHE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "name_cache.json")
+EMBEDDING_MODEL = "sentence-transformers/all-MiniLM-L6-v2"
+USERS_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "users.json")
+DEFAULT_WATCH_FOLDER = r"\\s185f0024\tids\A185_MO_India\01_Team_Specific_Doc\02_Supply Chain\01_PPC"
+DEFAULT_QUARANTINE_FOLDER = r"\\s185f0024\tids\Quarantine_Folder"
+DEFAULT_CACHE_SERVER = "127.0.0.1:50555"
+
+# Office/AutoCAD/browser temp and system files that are never worth an LLM call
+IGNORE_PATTERNS = ["*~$*", "*.tmp", "*.~*", ".~lock.*", "Thumbs.db", "*.crdownload"]
+
+NAME_PROMPT = 'Does "{file_name}" contain a personal first name? Reply "yes" or "no".'
+BATCH_PROMPT = 'Does each name contain a personal first name? Reply only with a JSON array of true/false in order.\nNAMES: {file_names}'
+
+TOKEN_SPLIT_RE = re.compile(r"[_\-\s\.]+")
+# First word of a reply, past any leading quotes, asterisks or other punctuation
+FIRST_WORD_RE = re.compile(r"[\W_]*([a-z]+)")
+
+# Words common in shared business file names that never hint at a person on their own
+BUSINESS_WORDS = frozenset("""
+    a an and of for the to in on by with at from
+    ppc mo india team specific doc docs supply chain scm plan planning planned forecast
+    report reports weekly daily monthly quarterly yearly annual summary status update
+    data sheet sheets master list tracker template format review minutes mom meeting
+    final draft new old copy backup bkp temp tmp rev revised updated latest version
+    order orders po invoice stock inventory material materials production dispatch
+    vendor vendors supplier suppliers customer customers sales purchase budget cost
+    project projects schedule timeline kpi dashboard analysis details detail info
+    jan feb mar apr may jun jul aug sep sept oct nov dec
+    january february march april june july august september october november december
+    week month year fy ytd mtd
+    xlsx xls xlsm csv docx pdf ppt pptx txt zip msg png jpg jpeg
+""".split())
+
+# A name is only cleared locally when every token is a business word or a code (numbers, dates,
+# versions, project codes); any other token may be a person's name and goes to the LLM. The scan
+# runs on the lowercased UTF-8 bytes in a Numba kernel. Words are looked up by sorted 64-bit FNV-1a
+# hashes, and a hash match is confirmed against the word's bytes so a collision can't skip a token.
+FNV_OFFSET = np.uint64(0xcbf29ce484222325)
+FNV_PRIME = np.uint64(0x100000001b3)
+
+@njit(cache=True)
+def fnv1a(buf, start, end):
+    h = FNV_OFFSET
+    for i in range(start, end):
+        h ^= np.uint64(buf[i])
+        h *= FNV_PRIME
+    return h
+
+@njit(cache=True)
+def _is_known_word(buf, start, end, word_hashes, word_bytes, word_offsets):
+    h = fnv1a(buf, start, end)
+    idx = np.searchsorted(word_hashes, h)
+    while idx < word_hashes.shape[0] and word_hashes[idx] == h:
+        word_start = word_offsets[idx]
+        if word_offsets[idx + 1] - word_start == end - start:
+            same = True
+            for k in range(end - start):
+                if word_bytes[word_start + k] != buf[start + k]:
+                    same = False
+                    break
+            if same:
+                return True
+        idx += 1
+    return False
+
+@njit(cache=True)
+def _is_separator(c):
+    # Same separators as TOKEN_SPLIT_RE: "_", "-", ".", and whitespace
+    return c == 95 or c == 45 or c == 46 or c == 32 or (9 <= c <= 13)
+
+@njit(cache=True)
+def _is_code_token(buf, start, end):
+    # Codes such as "2024", "v2", "q3", "a185", "10b" or ordinals like "21st"
+    i = start
+    while i < end and i - start < 2 and 97 <= buf[i] <= 122:
+        i += 1
+    digits_start = i
+    while i < end and 48 <= buf[i] <= 57:
+        i += 1
+    if i == digits_start:
+        return False
+    rest = end - i
+    if rest == 0:
+        return True
+    if rest == 1:
+        return 97 <= buf[i] <= 122
+    if rest == 2 and digits_start == start:
+        a, b = buf[i], buf[i + 1]
+        return (a == 115 and b == 116) or (a == 110 and b == 100) or (a == 114 and b == 100) or (a == 116 and b == 104)
+    return False
+
+@njit(cache=True)
+def all_tokens_known(buf, word_hashes, word_bytes, word_offsets):
+    n = buf.shape[0]
+    start = 0
+    while start < n:
+        while start < n and _is_separator(buf[start]):
+            start += 1
+        end = start
+        while end < n and not _is_separator(buf[end]):
+            end += 1
+        if end > start and not _is_code_token(buf, start, end) and \
+                not _is_known_word(buf, start, end, word_hashes, word_bytes, word_offsets):
+            return False
+        start = end
+    return True
+
+def build_word_table(words):
+    """Return (hashes, bytes, offsets) arrays for _is_known_word, sorted by hash."""
+    entries = []
+    for word in words:
+        encoded = word.encode("utf-8")
+        buf = np.frombuffer(encoded, dtype=np.uint8)
+        entries.append((int(fnv1a(buf, 0, buf.shape[0])), encoded))
+    entries.sort()
+    hashes = np.array([h for h, _ in entries], dtype=np.uint64)
+    offsets = np.zeros(len(entries) + 1, dtype=np.int64)
+    offsets[1:] = np.cumsum([len(encoded) for _, encoded in entries])
+    word_bytes = np.frombuffer(b"".join(encoded for _, encoded in entries), dtype=np.uint8)
+    return hashes, word_bytes, offsets
+
+BUSINESS_WORD_TABLE = build_word_table(BUSINESS_WORDS)
+
+def normalize_name(name):
+    return name.strip().lower()
+
+def tokenize_name(name):
+    return [t for t in TOKEN_SPLIT_RE.split(name.lower()) if t]
+
+def is_obviously_name_free(name):
+    """
+    Cheap local pre-classifier: True when every token is a business word or code, so no
+    token can hold a personal name. Anything else is left for the LLM to decide.
+    """
+    buf = np.frombuffer(name.lower().encode("utf-8"), dtype=np.uint8)
+    return all_tokens_known(buf, *BUSINESS_WORD_TABLE)
+
+def parse_name_found(raw_response):
+    """
+    Read the verdict from the first word of a "yes"/"no" reply, or from a {"name_found": ...}
+    JSON reply cached by earlier versions. Returns None if the reply is neither.
+    """
+    answer = raw_response.strip().lower()
+    if answer.startswith("{"):
+        try:
+            name_found = orjson.loads(answer).get("name_found")
+        except (orjson.JSONDecodeError, AttributeError):
+            return None
+        return name_found if isinstance(name_found, bool) else None
+
+    match = FIRST_WORD_RE.match(answer)
+    first_word = match.group(1) if match else ""
+    if first_word in ("yes", "true"):
+        return True
+    if first_word in ("no", "false"):
+        return False
+    return None
+
+@lru_cache(maxsize=1024)
+def lookup_account(string_sid):
+    """Resolve a SID to DOMAIN\\name; the domain controller mapping never changes, so cache it."""
+    sid = win32security.ConvertStringSidToSid(string_sid)
+    name, domain, _ = win32security.LookupAccountSid(None, sid)
+    return f"{domain}\\{name}"
+
+@lru_cache(maxsize=1)
+def current_user_sid():
+    """String SID of the account the watcher runs as."""
+    token = win32security.OpenProcessToken(win32api.GetCurrentProcess(), win32security.TOKEN_QUERY)
+    sid, _ = win32security.GetTokenInformation(token, win32security.TokenUser)
+    return win32security.ConvertSidToStringSid(sid)
+
 def get_owner(path):
+    # The owner SID is read per file: shared folders hold files from many users
     try:
         sd = win32security.GetFileSecurity(path, win32security.OWNER_SECURITY_INFORMATION)
         owner_sid = sd.GetSecurityDescriptorOwner()
-        name, domain, _ = win32security.LookupAccountSid(None, owner_sid)
-        return f"{domain}\\{name}"
+        owner = lookup_account(win32security.ConvertSidToStringSid(owner_sid))
     except Exception as e:
         print(f"[WARNING] Could not get owner for {path}: {e}")
         return "Unknown"
+    return owner
+
+class NameCache:
+    """
+    Thread-safe exact-match LRU of LLM responses keyed by normalized name.
+    Entries are flushed to a JSON file every `flush_interval` seconds and at exit,
+    so hits survive restarts without writing the file on every miss.
+    """
+    def __init__(self, path, maxsize=4096, flush_interval=5.0):
+        self.path = path
+        self.maxsize = maxsize
+        self.flush_interval = flush_interval
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._dirty = False
+        self._load()
+        threading.Thread(target=self._flush_loop, name="guardian-cache-flush", daemon=True).start()
+        atexit.register(self.flush)
+
+    def _load(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                self._entries.update(json.load(f))
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError) as e:
+            print(f"[WARNING] Could not load name cache {self.path}: {e}")
+            return
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def _save(self, entries):
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(entries, f)
+            os.replace(tmp_path, self.path)
+            return True
+        except OSError as e:
+            print(f"[WARNING] Could not save name cache {self.path}: {e}")
+            return False
+
+    def _flush_loop(self):
+        while True:
+            time.sleep(self.flush_interval)
+            self.flush()
+
+    def flush(self):
+        """Write the entries to disk if anything changed since the last flush."""
+        with self._flush_lock:
+            # Snapshot under the lock, write outside it so get()/put() never wait on disk I/O
+            with self._lock:
+                if not self._dirty:
+                    return
+                entries = dict(self._entries)
+                self._dirty = False
+            if not self._save(entries):
+                with self._lock:
+                    self._dirty = True
+
+    def get(self, key):
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+            return value
+
+    def put(self, key, value):
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+            self._dirty = True
+
+class SemanticCache:
+    """
+    Nearest-neighbour cache of name_found verdicts over L2-normalized name embeddings.
+    A hit needs cosine similarity above `threshold`, token Jaccard overlap above
+    `min_jaccard`, and every token the two names don't share to be a business word
+    or code: "ppc_plan_2024" may reuse "ppc_plan_2023", but "ppc_plan_hemant" never
+    reuses "ppc_plan_pune", because the swapped token is the one that decides the verdict.
+    If the embedding model cannot be loaded or run, the cache disables itself and
+    every lookup misses.
+    """
+    def __init__(self, model_name=EMBEDDING_MODEL, threshold=0.92, min_jaccard=0.5, maxsize=10000):
+        self.model_name = model_name
+        self.threshold = threshold
+        self.min_jaccard = min_jaccard
+        self.maxsize = maxsize
+        self._model = None
+        self._model_lock = threading.Lock()
+        self.disabled = False
+        self._lock = threading.Lock()
+        self._embeddings = None
+        self._verdicts = []
+        self._tokens = []
+        self._last_used = np.zeros(maxsize, dtype=np.int64)
+        self._clock = 0
+        self._encode = lru_cache(maxsize=256)(self._encode_uncached)
+
+    def _disable(self, error):
+        with self._model_lock:
+            if not self.disabled:
+                self.disabled = True
+                print(f"[WARNING] Semantic cache disabled, embedding model unavailable: {error}")
+
+    def _get_model(self):
+        with self._model_lock:
+            if self._model is None and not self.disabled:
+                try:
+                    from sentence_transformers import SentenceTransformer
+                    self._model = SentenceTransformer(self.model_name, device="cpu")
+                except Exception as e:
+                    self.disabled = True
+                    print(f"[WARNING] Semantic cache disabled, embedding model unavailable: {e}")
+            return self._model
+
+    def _encode_uncached(self, name):
+        model = self._get_model()
+        if model is None:
+            return None
+        try:
+            vec = model.encode(name, normalize_embeddings=True)
+        except Exception as e:
+            self._disable(e)
+            return None
+        return np.asarray(vec, dtype=np.float32)
+
+    def warmup(self):
+        """Load the model and run one forward pass so the first real lookup doesn't pay for it."""
+        self._encode_uncached("warmup")
+
+    @staticmethod
+    def _jaccard(a, b):
+        union = a | b
+        return len(a & b) / len(union) if union else 1.0
+
+    @staticmethod
+    def _differ_only_in_known_words(a, b):
+        return all(is_obviously_name_free(token) for token in a ^ b)
+
+    def get(self, name):
+        if self.disabled:
+            return None
+        vec = self._encode(name)
+        if vec is None:
+            return None
+        tokens = set(tokenize_name(name))
+        with self._lock:
+            size = len(self._verdicts)
+            if not size:
+                return None
+            scores = self._embeddings[:size] @ vec
+            candidates = np.flatnonzero(scores > self.threshold)
+            for idx in candidates[np.argsort(-scores[candidates])]:
+                if self._jaccard(tokens, self._tokens[idx]) > self.min_jaccard and \
+                        self._differ_only_in_known_words(tokens, self._tokens[idx]):
+                    self._clock += 1
+                    self._last_used[idx] = self._clock
+                    return self._verdicts[idx]
+        return None
+
+    def put(self, name, name_found):
+        if self.disabled:
+            return
+        vec = self._encode(name)
+        if vec is None:
+            return
+        tokens = set(tokenize_name(name))
+        with self._lock:
+            if self._embeddings is None:
+                self._embeddings = np.empty((self.maxsize, vec.shape[0]), dtype=np.float32)
+            size = len(self._verdicts)
+            if size < self.maxsize:
+                idx = size
+                self._verdicts.append(name_found)
+                self._tokens.append(tokens)
+            else:
+                idx = int(np.argmin(self._last_used))
+                self._verdicts[idx] = name_found
+                self._tokens[idx] = tokens
+            self._embeddings[idx] = vec
+            self._clock += 1
+            self._last_used[idx] = self._clock
+
+class VerdictCache:
+    """Exact-match and semantic caches behind one get/put interface, local or served by cache_server.py."""
+    def __init__(self, path=NAME_CACHE_FILE):
+        self.exact = NameCache(path)
+        self.semantic = SemanticCache()
+
+    def get(self, key):
+        cached = self.exact.get(key)
+        if cached is not None:
+            return cached
+
+        name_found = self.semantic.get(key)
+        if name_found is not None:
+            return "yes" if name_found else "no"
+        return None
+
+    def put(self, key, raw_response):
+        # Unparseable replies are never cached, so one bad answer isn't replayed after restarts
+        name_found = parse_name_found(raw_response)
+        if name_found is None:
+            return
+        self.exact.put(key, raw_response)
+        self.semantic.put(key, name_found)
+
+class CacheManager(BaseManager):
+    pass
+
+CacheManager.register("get_cache")
+
+# Raised by manager connections and proxy calls when the cache server is down, restarted or misconfigured
+CACHE_SERVER_ERRORS = (OSError, EOFError, multiprocessing.AuthenticationError, RemoteError)
+
+def cache_server_authkey():
+    # BaseManager unpickles what it receives, so the key is what stands between the port and code execution
+    authkey = os.getenv("GUARDIAN_CACHE_AUTHKEY")
+    if not authkey:
+        raise ValueError("Missing GUARDIAN_CACHE_AUTHKEY environment variable")
+    return authkey.encode()
+
+def parse_address(address):
+    host, port = address.rsplit(":", 1)
+    return host, int(port)
+
+def connect_cache_server(address):
+    """Return a proxy to the VerdictCache of a running cache_server.py, shared by all watchers."""
+    manager = CacheManager(address=parse_address(address), authkey=cache_server_authkey())
+    manager.connect()
+    return manager.get_cache()
+
+class SharedVerdictCache:
+    """
+    VerdictCache served by cache_server.py. When the server stops answering, lookups and writes
+    go to a local VerdictCache, and reconnecting is retried every `retry_interval` seconds.
+    """
+    def __init__(self, address, retry_interval=30):
+        self.address = address
+        self.retry_interval = retry_interval
+        self._lock = threading.Lock()
+        self._proxy = connect_cache_server(address)
+        self._local = None
+        self._next_retry = 0.0
+
+    def _remote(self):
+        with self._lock:
+            if self._proxy is None and time.monotonic() >= self._next_retry:
+                try:
+                    self._proxy = connect_cache_server(self.address)
+                    print(f"[INFO] Reconnected to cache server at {self.address}")
+                except CACHE_SERVER_ERRORS:
+                    self._next_retry = time.monotonic() + self.retry_interval
+            return self._proxy
+
+    def _drop(self, proxy, error):
+        with self._lock:
+            if self._proxy is proxy:
+                print(f"[WARNING] Lost cache server at {self.address}, using a local cache: {error!r}")
+                self._proxy = None
+                self._next_retry = time.monotonic() + self.retry_interval
+
+    def _local_cache(self):
+        with self._lock:
+            if self._local is None:
+                self._local = VerdictCache()
+            return self._local
+
+    def get(self, key):
+        proxy = self._remote()
+        if proxy is not None:
+            try:
+                return proxy.get(key)
+            except CACHE_SERVER_ERRORS as e:
+                self._drop(proxy, e)
+        return self._local_cache().get(key)
+
+    def put(self, key, raw_response):
+        proxy = self._remote()
+        if proxy is not None:
+            try:
+                return proxy.put(key, raw_response)
+            except CACHE_SERVER_ERRORS as e:
+                self._drop(proxy, e)
+        return self._local_cache().put(key, raw_response)
 
 class Chain:
-    def __init__(self):
+    def __init__(self, cache=None):
         api_key = os.getenv("GROQ_API_KEY")
         if not api_key:
             raise ValueError("Missing GROQ_API_KEY environment variable")
 
-        custom_http_client = httpx.Client(verify=False, timeout=15.0)
+        # One pooled HTTP/2 client so concurrent batches multiplex over a kept-alive TLS connection.
+        # GROQ_CA_BUNDLE can point at a corporate CA bundle if TLS is intercepted by a proxy.
+        custom_http_client = httpx.Client(
+            http2=True,
+            verify=ssl.create_default_context(cafile=os.getenv("GROQ_CA_BUNDLE", certifi.where())),
+            timeout=15.0,
+            limits=httpx.Limits(max_keepalive_connections=32, max_connections=64, keepalive_expiry=300)
+        )
 
         self.llm = ChatGroq(
             temperature=0,
             groq_api_key=api_key,
-            model_name="llama-3.3-70b-versatile",
+            model_name="llama-3.1-8b-instant",
             http_client=custom_http_client
         )
+        # Build the prompt pipelines once instead of per file name
+        self._chain = PromptTemplate(input_variables=["file_name"], template=NAME_PROMPT) | self.llm
+        self._batch_chain = PromptTemplate(input_variables=["file_names"], template=BATCH_PROMPT) | self.llm
+        self.cache = cache if cache is not None else VerdictCache()
+
+    def warmup(self):
+        """Pay the one-time JIT, model-load and connection costs before the first real event."""
+        is_obviously_name_free("warmup_ramesh_test.xlsx")
+        if isinstance(self.cache, VerdictCache):
+            self.cache.semantic.warmup()
+        try:
+            self._invoke_llm("warmup_Ramesh_test.xlsx")
+        except Exception as e:
+            print(f"[WARNING] LLM warmup failed: {e}")
+
+    def lookup(self, name):
+        """Answer from the prefilter or the verdict cache, or return None if the LLM is needed."""
+        key = normalize_name(name)
+        # The prefilter runs first: it is cheaper than even a round-trip to a shared cache server
+        if is_obviously_name_free(key):
+            return "no"
+        return self.cache.get(key)
+
+    def remember(self, name, raw_response):
+        if parse_name_found(raw_response) is None:
+            print(f"[WARNING] Not caching unrecognized LLM reply for '{name}': {raw_response!r}")
+            return
+        # A failed cache write must never change the verdict that is returned
+        try:
+            self.cache.put(normalize_name(name), raw_response)
+        except Exception as e:
+            print(f"[WARNING] Could not cache verdict for '{name}': {e}")
 
     def check_names(self, name):
-        prompt = '''
-        You are an Indian assistant to check if there is any personal name in the file or folder name "{file_name}".  
-        Only answer in the exact JSON format: 
-        {{ "name_found": true or false }}
-        '''
-        prompt_template = PromptTemplate(
-            input_variables=["file_name"], 
-            template=prompt
-        )
-        llm_chain = prompt_template | self.llm
+        cached = self.lookup(name)
+        if cached is not None:
+            return cached
 
         try:
-            result = llm_chain.invoke({"file_name": name})
-            raw_response = result.content if hasattr(result, "content") else result
-            return raw_response
+            raw_response = self._invoke_llm(name)
         except Exception as e:
             print(f"[ERROR] LLM call failed for '{name}': {e}")
-            return '{"name_found": false}'
+            return "no"
+
+        self.remember(name, raw_response)
+        return raw_response
+
+    def check_names_batch(self, names):
+        """Answer several names with a single LLM request. Returns raw responses in input order."""
+        try:
+            verdicts = self._invoke_llm_batch(names)
+        except Exception as e:
+            print(f"[WARNING] Batched LLM call failed for {len(names)} names, checking one by one: {e}")
+            return [self.check_names(name) for name in names]
+
+        responses = []
+        for name, name_found in zip(names, verdicts):
+            raw_response = "yes" if name_found else "no"
+            self.remember(name, raw_response)
+            responses.append(raw_response)
+        return responses
+
+    def _invoke_llm(self, name):
+        result = self._chain.invoke({"file_name": name})
+        return result.content if hasattr(result, "content") else result
+
+    def _invoke_llm_batch(self, names):
+        result = self._batch_chain.invoke({"file_names": json.dumps(names)})
+        raw_response = result.content if hasattr(result, "content") else result
+        verdicts = orjson.loads(raw_response[raw_response.find("["):raw_response.rfind("]") + 1])
+        if len(verdicts) != len(names) or not all(isinstance(v, bool) for v in verdicts):
+            raise ValueError(f"Unexpected batch response: {raw_response}")
+        return verdicts
+
+class _PendingCheck:
+    def __init__(self, name):
+        self.name = name
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+class BatchChain:
+    """
+    Coalesces concurrent check_names calls that miss the local tiers into one LLM request
+    of up to `batch_size` names, waiting at most `max_wait` seconds to fill a batch.
+    """
+    def __init__(self, chain, batch_size=16, max_wait=0.05, max_in_flight=4):
+        self.chain = chain
+        self.batch_size = batch_size
+        self.max_wait = max_wait
+        self.max_in_flight = max_in_flight
+        self.q = queue.Queue()
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max_in_flight, thread_name_prefix="guardian-batch")
+        threading.Thread(target=self._collector, name="guardian-batcher", daemon=True).start()
+
+    def check_names(self, name):
+        cached = self.chain.lookup(name)
+        if cached is not None:
+            return cached
 
-# This is your user-to-machine mapping based on the details you provided
-user_to_machine = {
-    "APAC\\HEKOLLI": "C185LX082414174",
-    "APAC\\KHAIRES": "C185LX083361454",
-    "APAC\\SURESAD": "C185LX091093328",
-    "APAC\\SONIARN": "C185LX091074664"
-}
+        key = normalize_name(name)
+        with self._lock:
+            pending = self._pending.get(key)
+            if pending is None:
+                pending = self._pending[key] = _PendingCheck(name)
+                self.q.put(key)
+        pending.done.wait()
+        if pending.error is not None:
+            raise pending.error
+        return pending.result
+
+    def _collector(self):
+        while True:
+            batch = [self.q.get()]
+            deadline = time.monotonic() + self.max_wait
+            while len(batch) < self.batch_size:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(self.q.get(timeout=timeout))
+                except queue.Empty:
+                    break
+            self._executor.submit(self._dispatch, batch)
+
+    def _dispatch(self, keys):
+        with self._lock:
+            batch = [self._pending[key] for key in keys]
+        try:
+            try:
+                results = self.chain.check_names_batch([p.name for p in batch])
+            except Exception as e:
+                print(f"[ERROR] Batch dispatch failed, checking {len(batch)} names one by one: {e}")
+                results = None
+
+            for i, pending in enumerate(batch):
+                if results is not None:
+                    pending.result = results[i]
+                    continue
+                try:
+                    pending.result = self.chain.check_names(pending.name)
+                except Exception as e:
+                    # Surfaced to the waiting worker as an error rather than passed as "no"
+                    pending.error = e
+        finally:
+            with self._lock:
+                for key, pending in zip(keys, batch):
+                    del self._pending[key]
+                    pending.done.set()
+
+def load_user_map(path):
+    """Load the user-to-machine mapping as a read-only dict of "DOMAIN\\user" -> machine name."""
+    with open(path, "rb") as f:
+        users = orjson.loads(f.read())
+    if not isinstance(users, dict) or not all(
+            isinstance(user, str) and isinstance(machine, str) for user, machine in users.items()):
+        raise ValueError(f"{path} must be a JSON object mapping user names to machine names")
+    return types.MappingProxyType(users)
+
+# User-to-machine mapping, kept in users.json and reloaded whenever that file changes
+user_to_machine = load_user_map(USERS_FILE)
+
+class UserMapReloader(PatternMatchingEventHandler):
+    def __init__(self, path):
+        super().__init__(patterns=[os.path.basename(path)], ignore_directories=True)
+        self.path = path
+
+    def reload(self):
+        global user_to_machine
+        try:
+            user_to_machine = load_user_map(self.path)
+            print(f"[INFO] Reloaded user mapping from {self.path} ({len(user_to_machine)} users)")
+        except Exception as e:
+            # Runs on watchdog's dispatcher thread, so nothing may escape
+            print(f"[WARNING] Keeping previous user mapping, could not reload {self.path}: {e}")
+
+    def on_created(self, event):
+        self.reload()
+
+    def on_modified(self, event):
+        self.reload()
+
+    def on_moved(self, event):
+        self.reload()
+
+# Fire-and-forget msg.exe/rmdir processes that have not exited yet, as (process, on_exit) pairs
+pending_procs = []
+pending_procs_lock = threading.Lock()
+proc_reaper = None
+
+def reap_processes():
+    """Hand the exit code of each background process to its on_exit callback once it exits."""
+    while True:
+        time.sleep(1)
+        with pending_procs_lock:
+            still_running = []
+            finished = []
+            for proc, on_exit in pending_procs:
+                returncode = proc.poll()
+                if returncode is None:
+                    still_running.append((proc, on_exit))
+                else:
+                    finished.append((on_exit, returncode))
+            pending_procs[:] = still_running
+        for on_exit, returncode in finished:
+            try:
+                on_exit(returncode)
+            except Exception as e:
+                print(f"[ERROR] Background process handler failed: {e}")
+
+def watch_process(proc, on_exit):
+    global proc_reaper
+    with pending_procs_lock:
+        pending_procs.append((proc, on_exit))
+        if proc_reaper is None:
+            proc_reaper = threading.Thread(target=reap_processes, name="guardian-proc-reaper", daemon=True)
+            proc_reaper.start()
 
 def send_msg_to_user(client_machine, username, message):
+    cmd = ['msg', f'/server:{client_machine}', username, message]
     try:
-        cmd = ['msg', f'/server:{client_machine}', username, message]
-        subprocess.run(cmd, check=True)
-        print(f"[INFO] Sent message to {username}@{client_machine}")
-    except subprocess.CalledProcessError as e:
+        # Don't wait for msg.exe: an offline workstation would stall the worker until it times out
+        proc = subprocess.Popen(
+            cmd,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            creationflags=subprocess.DETACHED_PROCESS | subprocess.CREATE_NEW_PROCESS_GROUP
+        )
+    except OSError as e:
         print(f"[ERROR] Failed to send msg: {e}")
+        return
+
+    target = f"{username}@{client_machine}"
 
-class WatcherHandler(FileSystemEventHandler):
-    def __init__(self, chain, quarantine_dir=None):
-        super().__init__()
+    def on_exit(returncode):
+        if returncode == 0:
+            print(f"[INFO] Sent message to {target}")
+        else:
+            print(f"[ERROR] Failed to send msg to {target}: exit code {returncode}")
+
+    watch_process(proc, on_exit)
+
+class WatcherHandler(PatternMatchingEventHandler):
+    def __init__(self, chain, quarantine_dir=None, num_workers=8, debounce_delay=1.0):
+        super().__init__(ignore_patterns=IGNORE_PATTERNS, ignore_directories=False)
         self.chain = chain
         self.quarantine_dir = quarantine_dir
+        self.q = queue.Queue(maxsize=10000)
+        for i in range(num_workers):
+            threading.Thread(target=self._worker, name=f"guardian-worker-{i}", daemon=True).start()
+
+        self.debounce_delay = debounce_delay
+        self._pending = {}
+        self._pending_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._scheduler = sched.scheduler(time.monotonic, self._wait_for_wakeup)
+        threading.Thread(target=self._debounce_loop, name="guardian-debounce", daemon=True).start()
+
+    def _wait_for_wakeup(self, timeout):
+        # Sleep until the next deadline, or earlier when a new event has been scheduled
+        if self._wakeup.wait(timeout):
+            self._wakeup.clear()
+
+    def _debounce_loop(self):
+        while True:
+            self._scheduler.run()
+            self._wait_for_wakeup(None)
+
+    def debounce(self, path, is_folder):
+        """
+        Coalesce the burst of events a single save produces (create temp, write, rename)
+        so the path is queued once, `debounce_delay` seconds after its last event.
+        """
+        with self._pending_lock:
+            previous = self._pending.pop(path, None)
+            if previous is not None:
+                try:
+                    self._scheduler.cancel(previous)
+                except ValueError:
+                    pass  # Already fired
+            self._pending[path] = self._scheduler.enter(self.debounce_delay, 1, self._flush, (path, is_folder))
+        self._wakeup.set()
+
+    def _flush(self, path, is_folder):
+        with self._pending_lock:
+            self._pending.pop(path, None)
+        self.enqueue(path, is_folder)
+
+    def _worker(self):
+        """Drain queued events so slow LLM calls never block watchdog's dispatch thread."""
+        while True:
+            path, is_folder = self.q.get()
+            try:
+                self.process_name(path, is_folder)
+            except Exception as e:
+                print(f"[ERROR] Failed to process {path}: {e}")
+            finally:
+                self.q.task_done()
+
+    def enqueue(self, path, is_folder):
+        try:
+            self.q.put_nowait((path, is_folder))
+        except queue.Full:
+            print(f"[WARNING] Event queue full, waiting to queue: {path}")
+            self.q.put((path, is_folder))
     
-    def on_rm_error(self, func, path, exc_info):
-        """Error handler for shutil.rmtree."""
-        import stat
-        # Change file attributes and try again
+    def fix_permissions(self, path, is_folder):
+        """Make a file, or a folder and everything under it, writable before retrying a delete."""
+        # icacls grants access and attrib clears the read-only flag (all os.chmod does on Windows)
+        # for the whole subtree in one call each, instead of one SMB round-trip per entry.
+        # Only the watcher's own account is granted access: the grant outlives a failed delete,
+        # and flagged files must not become readable by everyone.
         try:
-            os.chmod(path, stat.S_IWRITE)
-            if os.path.isdir(path):
-                os.rmdir(path)
-            else:
-                os.unlink(path)
-            print(f"[ACTION] Fixed permissions and removed: {path}")
+            commands = [['icacls', path, '/grant', f'*{current_user_sid()}:(F)', '/T', '/C', '/Q'],
+                        ['attrib', '-R', path]]
+            if is_folder:
+                commands.append(['attrib', '-R', os.path.join(path, '*'), '/S', '/D'])
+            if all(subprocess.run(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+                                  check=False, timeout=30).returncode == 0 for cmd in commands):
+                return
+            print(f"[WARNING] Bulk permission fix failed for {path}, fixing entries one by one")
         except Exception as e:
-            print(f"[ERROR] Could not remove {path}: {e}")
+            print(f"[WARNING] Bulk permission fix failed for {path}, fixing entries one by one: {e}")
 
-    def delete_path(self, path, is_folder, max_retries=3, retry_delay=2):
+        try:
+            if is_folder:
+                for root, dirs, files in os.walk(path):
+                    for d in dirs:
+                        os.chmod(os.path.join(root, d), 0o777)
+                    for f in files:
+                        os.chmod(os.path.join(root, f), 0o777)
+            os.chmod(path, 0o777)
+        except Exception as e:
+            print(f"[WARNING] Could not modify permissions: {e}")
+
+    def _rmdir_in_background(self, path):
+        # Let one detached rmdir clear the rest instead of fixing it entry by entry
+        proc = subprocess.Popen(
+            ['cmd', '/c', 'rmdir', '/s', '/q', path],
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            creationflags=subprocess.DETACHED_PROCESS
+        )
+        print(f"[ACTION] Handed folder to background rmdir: {path}")
+
+        def on_exit(returncode):
+            # rmdir /s can exit 0 after skipping locked files, so check the folder is really gone
+            if returncode == 0 and not os.path.exists(path):
+                print(f"[ACTION] Successfully deleted folder: {path}")
+                return
+            print(f"[WARNING] Background rmdir left {path} behind (exit code {returncode}), retrying")
+            threading.Thread(target=self.delete_path, args=(path, True),
+                             kwargs={"background_rmdir": False}, daemon=True).start()
+
+        watch_process(proc, on_exit)
+
+    def delete_path(self, path, is_folder, max_retries=3, retry_delay=2, background_rmdir=True):
         """
         Attempt to delete a file or folder with retries.
         If deletion fails after retries and quarantine_dir is set, move it there.
+        A folder that refuses shutil.rmtree is first handed to a background rmdir,
+        which falls back to these retries if it fails.
         """
-        if not os.path.exists(path):
-            print(f"[INFO] Path does not exist: {path}")
-            return False
-
         for attempt in range(1, max_retries + 1):
             try:
-                # Try to fix permissions first (like you already do)
-                try:
-                    if is_folder:
-                        for root, dirs, files in os.walk(path):
-                            for d in dirs:
-                                os.chmod(os.path.join(root, d), 0o777)
-                            for f in files:
-                                os.chmod(os.path.join(root, f), 0o777)
-                        os.chmod(path, 0o777)
-                    else:
-                        os.chmod(path, 0o777)
-                except Exception as e:
-                    print(f"[WARNING] Could not modify permissions: {e}")
-
-                # Try deleting
+                # Try deleting, only touching permissions when the happy path is refused
                 if is_folder:
-                    shutil.rmtree(path, onerror=self.on_rm_error)
+                    try:
+                        shutil.rmtree(path)
+                    except PermissionError:
+                        if not background_rmdir:
+                            raise
+                        # Hand off only once; if Popen itself fails the retries below take over
+                        background_rmdir = False
+                        self._rmdir_in_background(path)
+                        return True
                 else:
-                    os.remove(path)
+                    try:
+                        os.remove(path)
+                    except PermissionError:
+                        os.chmod(path, 0o777)
+                        os.remove(path)
 
                 print(f"[ACTION] Successfully deleted {'folder' if is_folder else 'file'}: {path}")
                 return True
 
+            except FileNotFoundError:
+                # Checked here rather than with os.path.exists, which costs an extra stat over SMB
+                print(f"[INFO] Path does not exist: {path}")
+                return False
+
             except Exception as e:
                 print(f"[WARNING] Attempt {attempt} failed to delete {path}: {e}")
 
                 if attempt < max_retries:
+                    self.fix_permissions(path, is_folder)
                     time.sleep(retry_delay)
                 else:
                     # After max retries fail:
@@ -151,16 +941,16 @@ class WatcherHandler(FileSystemEventHandler):
 
     def process_name(self, path, is_folder=False):
         name = os.path.basename(path)
+        if name.startswith(".") or name.startswith("~$"):
+            return
         typ = "Folder" if is_folder else "File"
         owner = get_owner(path)
         print(f"{typ} detected: {name} (Owner: {owner})")
 
         raw_response = self.chain.check_names(name)
-        try:
-            response_json = json.loads(raw_response)
-            name_found = response_json.get("name_found", False)
-        except json.JSONDecodeError:
-            print(f"[WARNING] Invalid JSON from LLM for '{name}': {raw_response}")
+        name_found = parse_name_found(raw_response)
+        if name_found is None:
+            print(f"[WARNING] Invalid response from LLM for '{name}': {raw_response}")
             name_found = False
 
         if name_found:
@@ -182,19 +972,50 @@ class WatcherHandler(FileSystemEventHandler):
             print(f"[INFO] No personal name detected in {typ.lower()} name: '{name}'")
 
     def on_created(self, event):
-        self.process_name(event.src_path, is_folder=event.is_directory)
+        self.debounce(event.src_path, event.is_directory)
 
     def on_moved(self, event):
-        self.process_name(event.dest_path, is_folder=event.is_directory)
+        # dispatch() lets a move through when either path is not ignored, so Office renaming
+        # "Report.xlsx" to "~WRL0001.tmp" on save still arrives here; drop moves into ignored names
+        dest_path = os.fsdecode(event.dest_path)
+        if not match_any_paths([dest_path], excluded_patterns=self.ignore_patterns,
+                               case_sensitive=self.case_sensitive):
+            return
+        self.debounce(dest_path, event.is_directory)
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Remove files and folders whose names contain personal names.")
+    parser.add_argument("--watch", default=DEFAULT_WATCH_FOLDER, help="Folder to monitor recursively")
+    parser.add_argument("--quarantine", default=DEFAULT_QUARANTINE_FOLDER,
+                        help="Folder to move items to when they cannot be deleted")
+    parser.add_argument("--no-quarantine", dest="quarantine", action="store_const", const=None,
+                        help="Never quarantine; only try to delete directly")
+    parser.add_argument("--cache-server", nargs="?", const=DEFAULT_CACHE_SERVER, default=None, metavar="HOST:PORT",
+                        help=f"Share the verdict cache through cache_server.py (default address {DEFAULT_CACHE_SERVER})")
+    return parser.parse_args(argv)
 
-def main():
-    folder_to_watch = r"\\s185f0024\tids\A185_MO_India\01_Team_Specific_Doc\02_Supply Chain\01_PPC"
-    quarantine_folder = r"\\s185f0024\tids\Quarantine_Folder"
+def main(argv=None):
+    args = parse_args(argv)
+    folder_to_watch = args.watch
+
+    cache = None
+    if args.cache_server:
+        try:
+            cache = SharedVerdictCache(args.cache_server)
+            print(f"[INFO] Using shared cache server at {args.cache_server}")
+        except (ValueError,) + CACHE_SERVER_ERRORS as e:
+            print(f"[WARNING] Could not reach cache server at {args.cache_server}, using a local cache: {e}")
 
-    chain = Chain()
-    event_handler = WatcherHandler(chain, quarantine_dir=quarantine_folder)
+    base_chain = Chain(cache=cache)
+    base_chain.warmup()
+    print("Warmup complete")
+    chain = BatchChain(base_chain)
+    # Enough workers blocked in check_names to fill every in-flight batch
+    event_handler = WatcherHandler(chain, quarantine_dir=args.quarantine,
+                                   num_workers=chain.batch_size * chain.max_in_flight)
     observer = Observer()
     observer.schedule(event_handler, folder_to_watch, recursive=True)
+    observer.schedule(UserMapReloader(USERS_FILE), os.path.dirname(USERS_FILE), recursive=False)
     observer.start()
     print(f"Monitoring started on {folder_to_watch}")
 
@@ -0,0 +1,73 @@
+"""
+Checks for the pure helpers in guardianAI.py: the Numba prefilter that decides which names skip
+the LLM, and parse_name_found. Run with `python -m pytest test_guardianAI.py`.
+"""
+import numpy as np
+import pytest
+
+import guardianAI
+from guardianAI import BUSINESS_WORDS, fnv1a, is_obviously_name_free, parse_name_found
+
+def as_buf(text):
+    return np.frombuffer(text.encode("utf-8"), dtype=np.uint8)
+
+@pytest.mark.parametrize("name", [
+    "PPC_Weekly_Report_2024-10.xlsx",
+    "Stock_v2_Q3.xlsx",
+    "final-draft_21st.pdf",
+    "A185_MO_India plan.xlsx",
+    "Summary 10b 3rd 22nd.docx",
+])
+def test_business_words_and_codes_skip_the_llm(name):
+    assert is_obviously_name_free(name)
+
+@pytest.mark.parametrize("name", [
+    "John_Smith.xlsx",
+    "Khairnar_data.xlsx",
+    "koli_data.xlsx",
+    "weekly_report_harpreet.xlsx",
+    "ReportRamesh.xlsx",
+    "v2ramesh.xlsx",
+    "रमेश_report.xlsx",
+    "José_stock.xlsx",
+])
+def test_any_unknown_token_goes_to_the_llm(name):
+    assert not is_obviously_name_free(name)
+
+@pytest.mark.parametrize("name", ["", "___", " - . "])
+def test_names_without_tokens_are_name_free(name):
+    assert is_obviously_name_free(name)
+
+def test_every_business_word_is_known():
+    for word in BUSINESS_WORDS:
+        assert is_obviously_name_free(word), word
+
+def test_hash_collision_does_not_skip_a_token():
+    # A table holding "ramesh"'s hash but another word's bytes stands in for a real collision
+    buf = as_buf("ramesh")
+    hashes = np.array([fnv1a(buf, 0, buf.shape[0])], dtype=np.uint64)
+    offsets = np.array([0, 6], dtype=np.int64)
+    assert not guardianAI._is_known_word(buf, 0, 6, hashes, as_buf("report"), offsets)
+    assert guardianAI._is_known_word(buf, 0, 6, hashes, as_buf("ramesh"), offsets)
+
+@pytest.mark.parametrize("reply, expected", [
+    ("yes", True),
+    ("Yes.", True),
+    ('"yes"', True),
+    ("True", True),
+    ("**No**", False),
+    ("  NO", False),
+    ("false", False),
+    ("No, 'Trueman' is a surname", False),
+    ("Yes, but not a known surname", True),
+    ('{"name_found": true}', True),
+    ('{"name_found": false}', False),
+    ('{"name_found": "yes"}', None),
+    ("{bad", None),
+    ("[true]", True),
+    ("The name Ramesh, so yes", None),
+    ("nothing", None),
+    ("", None),
+])
+def test_parse_name_found(reply, expected):
+    assert parse_name_found(reply) is expected